@@ -4,14 +4,23 @@
 from __future__ import annotations
 
 import argparse
-import json
+import heapq
 import logging
-from dataclasses import dataclass
+import os
+import pickle
+from collections import Counter
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List
 
+import orjson
 import yaml
 
+try:
+    from yaml import CSafeLoader as YAMLLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YAMLLoader
+
 TYPE_KEY_MAP = {
     "A": "A",
     "B": "B",
@@ -19,16 +28,17 @@ TYPE_KEY_MAP = {
     "C-EXT": "C-Extended",
     "C-EXTENDED": "C-Extended",
 }
+READ_BUFFER_SIZE = 1 << 20
 
 
-@dataclass
+@dataclass(slots=True)
 class PromptTask:
     prompt_id: str
     prompt_type: str
     minutes: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Labeler:
     id: str
     name: str
@@ -40,35 +50,67 @@ class Labeler:
         return self.hours_available * 60
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment:
     labeler: Labeler
     tasks: List[PromptTask]
+    minutes_committed: float = field(init=False)
+    remaining: float = field(init=False)
+    type_totals: Counter[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.type_totals = Counter()
+        for task in self.tasks:
+            self.type_totals[task.prompt_type] += task.minutes
+        self.minutes_committed = sum(task.minutes for task in self.tasks)
+        self.remaining = self.labeler.minutes_available - self.minutes_committed
+
+    def add(self, task: PromptTask) -> None:
+        self.tasks.append(task)
+        self.type_totals[task.prompt_type] += task.minutes
+        self.minutes_committed += task.minutes
+        self.remaining -= task.minutes
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """Load a YAML file, reusing a pickled copy while the source mtime is unchanged."""
+    cache_path = path.with_suffix(path.suffix + ".pkl")
+    mtime = os.stat(path).st_mtime_ns
+    try:
+        with cache_path.open("rb") as f:
+            cached_mtime, data = pickle.load(f)
+        if cached_mtime == mtime:
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+        pass
 
-    @property
-    def minutes_committed(self) -> float:
-        return sum(task.minutes for task in self.tasks)
-
-    @property
-    def remaining_minutes(self) -> float:
-        return self.labeler.minutes_available - self.minutes_committed
+    with path.open("r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=YAMLLoader)
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            pickle.dump((mtime, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        logging.debug("Could not write YAML cache %s: %s", cache_path, exc)
+    return data
 
 
 def load_time_model(path: Path) -> Dict[str, float]:
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data = load_yaml_cached(path)
     return {str(k): float(v) for k, v in data.items()}
 
 
 def load_labelers(path: Path) -> List[Labeler]:
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data = load_yaml_cached(path)
     labelers = []
     for entry in data.get("labelers", []):
+        # YAML reads ids like `7` as ints; orjson only accepts str dict keys.
+        labeler_id = str(entry["id"])
         labelers.append(
             Labeler(
-                id=entry["id"],
-                name=entry.get("name", entry["id"]),
+                id=labeler_id,
+                name=entry.get("name", labeler_id),
                 hours_available=float(entry.get("hours_available", 0)),
                 focus=[focus.upper() for focus in entry.get("focus", [])],
             )
@@ -78,11 +120,11 @@ def load_labelers(path: Path) -> List[Labeler]:
 
 def load_prompts(path: Path, time_model: Dict[str, float]) -> List[PromptTask]:
     tasks: List[PromptTask] = []
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb", buffering=READ_BUFFER_SIZE) as f:
         for line in f:
             if not line.strip():
                 continue
-            payload = json.loads(line)
+            payload = orjson.loads(line)
             raw_type = payload.get("type", "").upper()
             normalized = TYPE_KEY_MAP.get(raw_type, raw_type)
             minutes = time_model.get(normalized)
@@ -94,31 +136,29 @@ def load_prompts(path: Path, time_model: Dict[str, float]) -> List[PromptTask]:
 
 def allocate(tasks: List[PromptTask], labelers: List[Labeler]) -> List[Assignment]:
     assignments = [Assignment(labeler=labeler, tasks=[]) for labeler in labelers]
+    # Max-heap on remaining capacity; the index breaks ties in labeler order.
+    heap = [(-assignment.remaining, idx) for idx, assignment in enumerate(assignments)]
+    heapq.heapify(heap)
     # Sort tasks longest first to balance workload
     tasks_sorted = sorted(tasks, key=lambda t: t.minutes, reverse=True)
     for task in tasks_sorted:
-        assignments.sort(key=lambda a: a.remaining_minutes, reverse=True)
-        target = assignments[0]
-        if target.remaining_minutes <= 0:
+        _, idx = heapq.heappop(heap)
+        target = assignments[idx]
+        if target.remaining <= 0:
             logging.warning("All labelers are fully allocated; task %s remains", task.prompt_id)
-            target.tasks.append(task)
-        else:
-            target.tasks.append(task)
+        target.add(task)
+        heapq.heappush(heap, (-target.remaining, idx))
     return assignments
 
 
 def summarize(assignments: List[Assignment]) -> Dict[str, Dict[str, float]]:
     summary: Dict[str, Dict[str, float]] = {}
     for assignment in assignments:
-        type_totals: Dict[str, float] = {}
-        for task in assignment.tasks:
-            type_totals.setdefault(task.prompt_type, 0.0)
-            type_totals[task.prompt_type] += task.minutes
         summary[assignment.labeler.id] = {
             "name": assignment.labeler.name,
             "hours_committed": assignment.minutes_committed / 60,
-            "hours_remaining": assignment.remaining_minutes / 60,
-            "type_breakdown": type_totals,
+            "hours_remaining": assignment.remaining / 60,
+            "type_breakdown": dict(assignment.type_totals),
         }
     return summary
 
@@ -141,8 +181,7 @@ def main() -> None:
     summary = summarize(assignments)
 
     args.out.parent.mkdir(parents=True, exist_ok=True)
-    with args.out.open("w", encoding="utf-8") as f:
-        json.dump({"assignments": summary}, f, indent=2)
+    args.out.write_bytes(orjson.dumps({"assignments": summary}, option=orjson.OPT_INDENT_2))
 
     total_minutes = sum(task.minutes for task in tasks)
     total_capacity = sum(labeler.minutes_available for labeler in labelers)
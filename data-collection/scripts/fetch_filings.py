@@ -4,24 +4,30 @@
 from __future__ import annotations
 
 import argparse
-import json
+import itertools
 import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Iterable, List, Optional
 
-import pdfkit
+import orjson
 import requests
 from dateutil import parser as dateparser
+from requests.adapters import HTTPAdapter
+from weasyprint import HTML
 
 SEARCH_ENDPOINT = "https://efts.sec.gov/LATEST/search-index"
 USER_AGENT_FALLBACK = "FilingsCollector/1.0 contact@example.com"
+SEC_MAX_REQUESTS_PER_SECOND = 10
+DOWNLOAD_WORKERS = 8
 
 
-@dataclass
+@dataclass(slots=True)
 class Filing:
     doc_id: str
     cik: str
@@ -38,24 +44,74 @@ class Filing:
         return self.filing_url
 
 
-def build_search_payload(start_date: str, from_offset: int, page_size: int) -> dict:
-    return {
+class RateLimiter:
+    """Thread-safe token bucket used to stay under the SEC request rate cap.
+
+    The default capacity of one token spaces requests ``1 / rate`` seconds
+    apart; a larger bucket would allow bursts above ``rate`` in any one-second
+    window. The bucket starts empty so the first burst is paced as well.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def build_session(user_agent: str, pool_size: int = 16) -> requests.Session:
+    session = requests.Session()
+    session.headers.update({"User-Agent": user_agent, "Accept-Encoding": "gzip, deflate"})
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def build_search_payload(
+    start_date: str, search_after: Optional[List], page_size: int, from_offset: int = 0
+) -> dict:
+    payload = {
         "keys": "formType:\"10-K\" OR formType:\"10-Q\"",
         "category": "custom",
         "forms": ["10-K", "10-Q"],
         "startdt": start_date,
-        "from": from_offset,
         "size": page_size,
         "sortField": "filedAt",
         "sortOrder": "desc",
     }
+    if search_after:
+        payload["search_after"] = search_after
+    else:
+        payload["from"] = from_offset
+    return payload
 
 
 def fetch_search_results(session: requests.Session, start_date: str, total: int, page_size: int = 100) -> Iterable[dict]:
+    # Page with the sort cursor of the previous page's last hit rather than a
+    # growing offset so the server does not re-scan earlier results. Responses
+    # without a cursor fall back to offset paging.
     fetched = 0
+    search_after: Optional[List] = None
     while fetched < total:
-        payload = build_search_payload(start_date, fetched, page_size)
-        logging.info("Querying SEC search API from offset %s", fetched)
+        payload = build_search_payload(start_date, search_after, page_size, fetched)
+        if search_after:
+            logging.info("Querying SEC search API after cursor %s", search_after)
+        else:
+            logging.info("Querying SEC search API from offset %s", fetched)
         resp = session.post(SEARCH_ENDPOINT, json=payload)
         resp.raise_for_status()
         data = resp.json()
@@ -68,6 +124,7 @@ def fetch_search_results(session: requests.Session, start_date: str, total: int,
             fetched += 1
             if fetched >= total:
                 break
+        search_after = hits[-1].get("sort") or None
         time.sleep(0.2)
 
 
@@ -95,7 +152,20 @@ def to_filing(hit: dict) -> Optional[Filing]:
 
 def ensure_pdf(html_content: str, output_path: Path) -> None:
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    pdfkit.from_string(html_content, str(output_path))
+    HTML(string=html_content).write_pdf(str(output_path))
+
+
+def download_filing(
+    filing: Filing,
+    session: requests.Session,
+    pdf_path: Path,
+    rate_limiter: RateLimiter,
+) -> None:
+    rate_limiter.acquire()
+    logging.info("Downloading HTML for %s", filing.doc_id)
+    resp = session.get(filing.html_url)
+    resp.raise_for_status()
+    ensure_pdf(resp.text, pdf_path)
 
 
 def download_filings(
@@ -104,22 +174,29 @@ def download_filings(
     output_dir: Path,
     pdf_dir: Path,
     force: bool = False,
+    workers: int = DOWNLOAD_WORKERS,
+    rate_limiter: Optional[RateLimiter] = None,
 ) -> List[Filing]:
+    rate_limiter = rate_limiter or RateLimiter(SEC_MAX_REQUESTS_PER_SECOND)
     stored: List[Filing] = []
-    for filing in filings:
-        pdf_path = pdf_dir / f"{filing.doc_id}.pdf"
-        if pdf_path.exists() and not force:
-            logging.info("PDF already exists for %s", filing.doc_id)
-            filing.pdf_path = str(pdf_path.relative_to(output_dir.parent))
-            stored.append(filing)
-            continue
-        logging.info("Downloading HTML for %s", filing.doc_id)
-        resp = session.get(filing.html_url)
-        resp.raise_for_status()
-        ensure_pdf(resp.text, pdf_path)
-        filing.pdf_path = str(pdf_path.relative_to(output_dir.parent))
-        stored.append(filing)
-        time.sleep(0.3)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            pending = []
+            for filing in filings:
+                pdf_path = pdf_dir / f"{filing.doc_id}.pdf"
+                if pdf_path.exists() and not force:
+                    logging.info("PDF already exists for %s", filing.doc_id)
+                else:
+                    pending.append(executor.submit(download_filing, filing, session, pdf_path, rate_limiter))
+                filing.pdf_path = str(pdf_path.relative_to(output_dir.parent))
+                stored.append(filing)
+            for future in pending:
+                future.result()
+        except BaseException:
+            # Fail fast: drop queued downloads instead of letting the executor
+            # finish them before the error surfaces.
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
     return stored
 
 
@@ -131,34 +208,29 @@ def main() -> None:
     parser.add_argument("--pdf-dir", type=Path, default=Path("data/filings/pdfs"), help="Directory to store PDFs")
     parser.add_argument("--user-agent", type=str, default=os.getenv("SEC_USER_AGENT", USER_AGENT_FALLBACK))
     parser.add_argument("--force", action="store_true", help="Re-download and overwrite existing PDFs")
+    parser.add_argument("--workers", type=int, default=DOWNLOAD_WORKERS, help="Concurrent filing downloads")
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-    session = requests.Session()
-    session.headers.update({"User-Agent": args.user_agent, "Accept-Encoding": "gzip, deflate"})
+    session = build_session(args.user_agent)
 
     raw_hits = fetch_search_results(session, args.start_date, args.count)
-    filings = []
-    for hit in raw_hits:
-        filing = to_filing(hit)
-        if filing is None:
-            continue
-        filings.append(filing)
-        if len(filings) >= args.count:
-            break
+    filings = list(filter(None, (to_filing(hit) for hit in itertools.islice(raw_hits, args.count))))
 
     if len(filings) < args.count:
         logging.warning("Only located %s filings matching constraints", len(filings))
 
-    stored = download_filings(filings, session, args.output, args.pdf_dir, force=args.force)
+    stored = download_filings(
+        filings, session, args.output, args.pdf_dir, force=args.force, workers=args.workers
+    )
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as f:
+    with args.output.open("wb") as f:
         for filing in stored:
             record = asdict(filing)
             record["canonical_url"] = filing.canonical_url
-            f.write(json.dumps(record) + "\n")
+            f.write(orjson.dumps(record) + b"\n")
 
     logging.info("Wrote %s filings to %s", len(stored), args.output)
 
@@ -4,26 +4,30 @@
 from __future__ import annotations
 
 import argparse
-import json
+import asyncio
+import hashlib
 import logging
 import os
 import random
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Dict, List, Optional
 
 import openai
+import orjson
 
 TARGET_COUNTS = {"A": 30, "B": 50, "C": 45}
 C_EXTENDED_COUNT = 5
 MAX_STANDARD_C_FILINGS = 6
+DEFAULT_CONCURRENCY = 8
+READ_BUFFER_SIZE = 1 << 20
 
 SYSTEM_PROMPT = """You are an expert financial analyst creating grounded question prompts for annotators. Each prompt must cite the provided evidence and request a detailed answer."""
 
 TEMPLATE_PROMPT = """Create a question for labelers using the provided evidence. The question must require grounded reasoning, reference the company names, and include expected answer bullet points."""
 
 
-@dataclass
+@dataclass(slots=True)
 class Chunk:
     chunk_id: str
     doc_id: str
@@ -32,76 +36,122 @@ class Chunk:
 
 
 class PromptGenerator:
-    def __init__(self, model: str = "gpt-4o-mini", seed: int = 13):
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        seed: int = 13,
+        cache_dir: Optional[Path] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
         self.model = model
         self.seed = seed
+        self.cache_dir = cache_dir
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._doc_id_list: List[str] = []
         random.seed(seed)
         api_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY".lower())
         if not api_key:
             raise RuntimeError(
                 "OPENAI_API_KEY must be set in the environment to generate prompts via the OpenAI API."
             )
-        openai.api_key = api_key
+        self.client = openai.AsyncOpenAI(api_key=api_key)
+
+    def _cache_path(self, prompt_id: str, prompt_type: str, evidence: List[Chunk]) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        # Key on evidence content, not chunk IDs: IDs fall back to line
+        # numbers in chunks.jsonl and are reused across re-indexing runs.
+        # The prompt slot is part of the key so two slots that sample the
+        # same evidence keep their own completions.
+        key_payload = {
+            "prompt_id": prompt_id,
+            "type": prompt_type,
+            "chunks": [
+                [chunk.doc_id, chunk.section_hint, hashlib.blake2b(chunk.text.encode("utf-8")).hexdigest()]
+                for chunk in evidence
+            ],
+            "model": self.model,
+            "system": SYSTEM_PROMPT,
+            "template": TEMPLATE_PROMPT,
+        }
+        key = hashlib.blake2b(orjson.dumps(key_payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+        return self.cache_dir / f"{key}.txt"
+
+    async def llm_prompt(self, prompt_id: str, prompt_type: str, evidence: List[Chunk]) -> str:
+        cache_path = self._cache_path(prompt_id, prompt_type, evidence)
+        if cache_path is not None and cache_path.exists():
+            return cache_path.read_text(encoding="utf-8")
 
-    def llm_prompt(self, prompt_type: str, evidence: List[Chunk]) -> str:
         joined = "\n\n".join(
             f"[{chunk.doc_id} :: {chunk.section_hint or 'Unknown Section'}]\n{chunk.text}" for chunk in evidence
         )
-        completion = openai.ChatCompletion.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": (
-                        f"Prompt type: {prompt_type}. {TEMPLATE_PROMPT}\n\nEvidence:\n{joined}\n\nFormat as:"
-                        "\nQuestion:\n- ...\nExpected Answer Notes:\n- ..."
-                    ),
-                },
-            ],
-            temperature=0.7,
-        )
-        return completion.choices[0].message["content"].strip()
+        async with self._semaphore:
+            completion = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": (
+                            f"Prompt type: {prompt_type}. {TEMPLATE_PROMPT}\n\nEvidence:\n{joined}\n\nFormat as:"
+                            "\nQuestion:\n- ...\nExpected Answer Notes:\n- ..."
+                        ),
+                    },
+                ],
+                temperature=0.7,
+            )
+        prompt_text = completion.choices[0].message.content.strip()
+
+        if cache_path is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(prompt_text, encoding="utf-8")
+            os.replace(tmp_path, cache_path)
+        return prompt_text
 
     def sample_evidence(self, chunks_by_doc: Dict[str, List[Chunk]], num_docs: int) -> List[Chunk]:
-        doc_ids = random.sample(list(chunks_by_doc.keys()), num_docs)
+        doc_ids = random.sample(self._doc_id_list, num_docs)
         evidence: List[Chunk] = []
         for doc_id in doc_ids:
             evidence.append(random.choice(chunks_by_doc[doc_id]))
         return evidence
 
-    def generate(self, chunks: List[Chunk]) -> List[dict]:
+    async def generate_async(self, chunks: List[Chunk]) -> List[dict]:
         chunks_by_doc: Dict[str, List[Chunk]] = {}
         for chunk in chunks:
             chunks_by_doc.setdefault(chunk.doc_id, []).append(chunk)
+        self._doc_id_list = list(chunks_by_doc.keys())
 
+        # Evidence is sampled sequentially so the seed fully determines it; the
+        # LLM calls are collected and issued concurrently afterwards.
         outputs: List[dict] = []
+        pending: List[Awaitable[str]] = []
 
         # Type A: single-document grounding
         for idx in range(TARGET_COUNTS["A"]):
             evidence = self.sample_evidence(chunks_by_doc, 1)
-            prompt_text = self.llm_prompt("A", evidence)
+            prompt_id = f"A-{idx+1:03d}"
+            pending.append(self.llm_prompt(prompt_id, "A", evidence))
             outputs.append(
                 {
-                    "prompt_id": f"A-{idx+1:03d}",
+                    "prompt_id": prompt_id,
                     "type": "A",
                     "doc_ids": [chunk.doc_id for chunk in evidence],
                     "chunk_ids": [chunk.chunk_id for chunk in evidence],
-                    "prompt": prompt_text,
                 }
             )
 
         # Type B: two documents
         for idx in range(TARGET_COUNTS["B"]):
             evidence = self.sample_evidence(chunks_by_doc, min(2, len(chunks_by_doc)))
-            prompt_text = self.llm_prompt("B", evidence)
+            prompt_id = f"B-{idx+1:03d}"
+            pending.append(self.llm_prompt(prompt_id, "B", evidence))
             outputs.append(
                 {
-                    "prompt_id": f"B-{idx+1:03d}",
+                    "prompt_id": prompt_id,
                     "type": "B",
                     "doc_ids": [chunk.doc_id for chunk in evidence],
                     "chunk_ids": [chunk.chunk_id for chunk in evidence],
-                    "prompt": prompt_text,
                 }
             )
 
@@ -117,27 +167,30 @@ class PromptGenerator:
                 doc_count = max(2, doc_count)
                 evidence = self.sample_evidence(chunks_by_doc, doc_count)
                 prompt_label = "C"
-            prompt_text = self.llm_prompt(prompt_label, evidence)
+            prompt_id = f"C-{idx+1:03d}"
+            pending.append(self.llm_prompt(prompt_id, prompt_label, evidence))
             outputs.append(
                 {
-                    "prompt_id": f"C-{idx+1:03d}",
+                    "prompt_id": prompt_id,
                     "type": prompt_label,
                     "doc_ids": [chunk.doc_id for chunk in evidence],
                     "chunk_ids": [chunk.chunk_id for chunk in evidence],
-                    "prompt": prompt_text,
                 }
             )
 
+        prompt_texts = await asyncio.gather(*pending)
+        for record, prompt_text in zip(outputs, prompt_texts):
+            record["prompt"] = prompt_text
         return outputs
 
 
 def load_chunks(chunk_file: Path) -> List[Chunk]:
     chunks: List[Chunk] = []
-    with chunk_file.open("r", encoding="utf-8") as f:
+    with chunk_file.open("rb", buffering=READ_BUFFER_SIZE) as f:
         for idx, line in enumerate(f, start=1):
             if not line.strip():
                 continue
-            payload = json.loads(line)
+            payload = orjson.loads(line)
             chunk_id = payload.get("chunk_id") or f"chunk-{idx:05d}"
             chunk = Chunk(
                 chunk_id=chunk_id,
@@ -155,6 +208,16 @@ def main() -> None:
     parser.add_argument("--output", type=Path, default=Path("data/prompts/prompts.jsonl"))
     parser.add_argument("--model", type=str, default="gpt-4o-mini")
     parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path("data/prompts/cache"),
+        help="Directory for memoized LLM responses keyed on prompt ID, prompt type, evidence content, and model",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the OpenAI API")
+    parser.add_argument(
+        "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum in-flight OpenAI requests"
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -163,13 +226,16 @@ def main() -> None:
     if not chunks:
         raise SystemExit("No chunks found; run index_filings.py first")
 
-    generator = PromptGenerator(model=args.model, seed=args.seed)
-    prompts = generator.generate(chunks)
+    cache_dir = None if args.no_cache else args.cache_dir
+    generator = PromptGenerator(
+        model=args.model, seed=args.seed, cache_dir=cache_dir, concurrency=args.concurrency
+    )
+    prompts = asyncio.run(generator.generate_async(chunks))
 
     args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open("w", encoding="utf-8") as f:
+    with args.output.open("wb") as f:
         for prompt in prompts:
-            f.write(json.dumps(prompt) + "\n")
+            f.write(orjson.dumps(prompt) + b"\n")
 
     logging.info("Generated %s prompts", len(prompts))
 
@@ -4,28 +4,37 @@
 from __future__ import annotations
 
 import argparse
-import json
+import io
 import logging
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, asdict
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import orjson
 import pdfplumber
 import tiktoken
 
 SECTION_REGEX = re.compile(r"^(item\s+\d+[a-z]?)(?:\.|:)?\s*(.*)$", re.IGNORECASE)
 DEFAULT_MODEL = "gpt-3.5-turbo"
+READ_BUFFER_SIZE = 1 << 20
+# tiktoken's encode_batch defaults to 8 threads; the indexer already runs one
+# process per core, so each process encodes single-threaded.
+ENCODE_THREADS = 1
+# Filings in flight per process; bounds metadata read-ahead and buffered results.
+FILINGS_PER_PROCESS = 2
 
 
-def read_filings(metadata_path: Path) -> List[dict]:
-    filings = []
-    with metadata_path.open("r", encoding="utf-8") as f:
+def read_filings(metadata_path: Path) -> Iterator[dict]:
+    with metadata_path.open("rb", buffering=READ_BUFFER_SIZE) as f:
         for line in f:
             if not line.strip():
                 continue
-            filings.append(json.loads(line))
-    return filings
+            yield orjson.loads(line)
 
 
 def detect_section(line: str) -> Optional[str]:
@@ -40,19 +49,28 @@ def detect_section(line: str) -> Optional[str]:
 def page_sections(text: str) -> List[str]:
     sections = []
     for line in text.splitlines():
+        # Cheap prefix test first; nearly all lines are not "Item N" headers.
+        if line.lstrip()[:4].lower() != "item":
+            continue
         section = detect_section(line)
         if section:
             sections.append(section)
     return sections
 
 
-def chunk_text(text: str, encoder, target_tokens: int = 1500, window_tokens: int = 2000) -> List[str]:
+def chunk_text(
+    text: str,
+    encoder,
+    target_tokens: int = 1500,
+    window_tokens: int = 2000,
+    num_threads: int = ENCODE_THREADS,
+) -> List[str]:
     paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
     chunks: List[str] = []
     buffer: List[str] = []
     token_count = 0
-    for para in paragraphs:
-        para_tokens = len(encoder.encode(para))
+    para_token_counts = [len(tokens) for tokens in encoder.encode_batch(paragraphs, num_threads=num_threads)]
+    for para, para_tokens in zip(paragraphs, para_token_counts):
         if token_count + para_tokens > window_tokens and buffer:
             chunks.append("\n\n".join(buffer))
             buffer = [para]
@@ -86,66 +104,85 @@ def derive_section_hint(sections: List[str]) -> Optional[str]:
     return sections[0] if sections else None
 
 
-def process_pdf(doc: dict, encoder, base_path: Path) -> Tuple[List[dict], List[dict]]:
+def process_pdf(
+    doc: dict,
+    encoder,
+    base_path: Path,
+    pages_out: BinaryIO,
+    chunks_out: BinaryIO,
+    num_threads: int = ENCODE_THREADS,
+) -> None:
+    """Write page and chunk JSONL records for ``doc`` in a single pass over its pages."""
     pdf_path = base_path / doc["pdf_path"]
-    pages_output: List[dict] = []
-    chunks_output: List[dict] = []
-    with pdfplumber.open(pdf_path) as pdf:
-        sections_per_page: List[List[str]] = []
-        for page_number, page in enumerate(pdf.pages, start=1):
-            text = page.extract_text() or ""
-            sections = page_sections(text)
-            sections_per_page.append(sections)
-            pages_output.append(
-                {
-                    "doc_id": doc["doc_id"],
-                    "page": page_number,
-                    "text": text,
-                    "sections": sections,
-                }
-            )
     # Chunking with awareness of section hints and pages
     current_chunk: List[str] = []
     current_pages: List[int] = []
     current_sections: List[str] = []
+    # Running token total of current_chunk, so the buffer is never re-encoded.
+    combined_tokens = 0
 
     def flush_chunk():
+        nonlocal combined_tokens
         if not current_chunk:
             return
         chunk_text_value = "\n".join(current_chunk)
         chunk_sections = derive_section_hint(current_sections)
-        chunks_output.append(
-            {
-                "doc_id": doc["doc_id"],
-                "page_start": current_pages[0],
-                "page_end": current_pages[-1],
-                "section_hint": chunk_sections,
-                "text": chunk_text_value,
-            }
-        )
+        chunk_record = {
+            "doc_id": doc["doc_id"],
+            "page_start": current_pages[0],
+            "page_end": current_pages[-1],
+            "section_hint": chunk_sections,
+            "text": chunk_text_value,
+        }
+        chunks_out.write(orjson.dumps(chunk_record) + b"\n")
         current_chunk.clear()
         current_pages.clear()
         current_sections.clear()
+        combined_tokens = 0
 
-    for page_record in pages_output:
-        page_text = page_record["text"]
-        if not page_text:
-            continue
-        page_chunks = chunk_text(page_text, encoder)
-        for chunk in page_chunks:
-            tokens = len(encoder.encode(chunk))
-            if tokens > 2000:
-                logging.warning("Chunk exceeds 2000 tokens on doc %s page %s", doc["doc_id"], page_record["page"])
-            current_chunk.append(chunk)
-            current_pages.append(page_record["page"])
-            current_sections.extend(page_record.get("sections", []))
-            combined_tokens = len(encoder.encode("\n".join(current_chunk)))
-            if combined_tokens >= 1800:
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_number, page in enumerate(pdf.pages, start=1):
+            text = page.extract_text() or ""
+            sections = page_sections(text)
+            page_record = {
+                "doc_id": doc["doc_id"],
+                "page": page_number,
+                "text": text,
+                "sections": sections,
+            }
+            pages_out.write(orjson.dumps(page_record) + b"\n")
+            if not text:
+                continue
+            page_chunks = chunk_text(text, encoder, num_threads=num_threads)
+            chunk_token_counts = [
+                len(tokens) for tokens in encoder.encode_batch(page_chunks, num_threads=num_threads)
+            ]
+            for chunk, tokens in zip(page_chunks, chunk_token_counts):
+                if tokens > 2000:
+                    logging.warning("Chunk exceeds 2000 tokens on doc %s page %s", doc["doc_id"], page_number)
+                current_chunk.append(chunk)
+                current_pages.append(page_number)
+                current_sections.extend(sections)
+                combined_tokens += tokens
+                if combined_tokens >= 1800:
+                    flush_chunk()
+            if current_chunk:
                 flush_chunk()
-        if current_chunk:
-            flush_chunk()
 
-    return pages_output, chunks_output
+
+@lru_cache(maxsize=None)
+def _get_encoder(encoding_name: str):
+    # tiktoken encodings pickle poorly, so each process builds its own once.
+    return tiktoken.encoding_for_model(encoding_name)
+
+
+def _process_pdf_worker(doc: dict, encoding_name: str, base_path: Path) -> Tuple[str, bytes, bytes]:
+    # Workers cannot share the parent's file handles, so records are written to
+    # in-memory buffers and handed back as serialized JSONL bytes. Each result
+    # holds one whole filing; main() caps how many are in flight at once.
+    pages_buffer, chunks_buffer = io.BytesIO(), io.BytesIO()
+    process_pdf(doc, _get_encoder(encoding_name), base_path, pages_buffer, chunks_buffer)
+    return doc["doc_id"], pages_buffer.getvalue(), chunks_buffer.getvalue()
 
 
 def main() -> None:
@@ -155,26 +192,41 @@ def main() -> None:
     parser.add_argument("--chunks-out", type=Path, default=Path("data/docs/chunks.jsonl"))
     parser.add_argument("--pdf-root", type=Path, default=Path("."))
     parser.add_argument("--encoding", type=str, default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of indexing processes")
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-    filings = read_filings(args.metadata)
-    encoder = tiktoken.encoding_for_model(args.encoding)
+    # Resolve the encoding up front so a bad name fails before any work is
+    # scheduled; forked workers also inherit the warmed cache.
+    _get_encoder(args.encoding)
 
     args.pages_out.parent.mkdir(parents=True, exist_ok=True)
     args.chunks_out.parent.mkdir(parents=True, exist_ok=True)
 
-    with args.pages_out.open("w", encoding="utf-8") as pages_file, args.chunks_out.open(
-        "w", encoding="utf-8"
-    ) as chunks_file:
-        for doc in filings:
-            logging.info("Indexing %s", doc["doc_id"])
-            pages, chunks = process_pdf(doc, encoder, args.pdf_root)
-            for page_record in pages:
-                pages_file.write(json.dumps(page_record) + "\n")
-            for chunk_record in chunks:
-                chunks_file.write(json.dumps(chunk_record) + "\n")
+    workers = args.workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor, args.pages_out.open(
+        "wb"
+    ) as pages_file, args.chunks_out.open("wb") as chunks_file:
+        worker = partial(_process_pdf_worker, encoding_name=args.encoding, base_path=args.pdf_root)
+
+        def write_result(future) -> None:
+            doc_id, pages_jsonl, chunks_jsonl = future.result()
+            logging.info("Indexed %s", doc_id)
+            pages_file.write(pages_jsonl)
+            chunks_file.write(chunks_jsonl)
+
+        # Results are written in submission order, keeping the output in
+        # metadata order. Executor.map would submit every filing up front,
+        # hence the bounded window.
+        max_pending = workers * FILINGS_PER_PROCESS
+        pending = deque()
+        for doc in read_filings(args.metadata):
+            pending.append(executor.submit(worker, doc))
+            if len(pending) >= max_pending:
+                write_result(pending.popleft())
+        while pending:
+            write_result(pending.popleft())
 
     logging.info("Indexing complete")
 
@@ -7,7 +7,9 @@ any discrete label space will work.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, MutableMapping, Tuple
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
 
 
 Label = str
@@ -20,14 +22,14 @@ MAX_ITERATIONS = 50
 EPS = 1e-6
 
 
-@dataclass
+@dataclass(slots=True)
 class Review:
     item_id: ItemID
     reviewer_id: ReviewerID
     label: Label
 
 
-@dataclass
+@dataclass(slots=True)
 class ConsensusResult:
     item_id: ItemID
     label: Label
@@ -36,7 +38,7 @@ class ConsensusResult:
     needs_sme: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class DawidSkeneModel:
     priors: Dict[Label, float]
     confusion_matrices: Dict[ReviewerID, Dict[Label, Dict[Label, float]]]
@@ -49,30 +51,24 @@ ROUTING_THRESHOLDS = {
 }
 
 
-def _normalize(dist: MutableMapping[Label, float]) -> None:
-    total = sum(dist.values())
-    if total <= 0:
-        size = len(dist)
-        for key in dist:
-            dist[key] = 1.0 / size
-        return
-    inv_total = 1.0 / total
-    for key in dist:
-        dist[key] *= inv_total
+def _normalize(dist: np.ndarray) -> np.ndarray:
+    """Normalize ``dist`` in place along its last axis; all-zero rows become uniform."""
+
+    totals = dist.sum(axis=-1, keepdims=True)
+    empty = totals <= 0
+    np.divide(dist, totals, out=dist, where=~empty)
+    if empty.any():
+        dist[np.broadcast_to(empty, dist.shape)] = 1.0 / dist.shape[-1]
+    return dist
 
 
-def _initialize_priors(labels: Iterable[Label]) -> Dict[Label, float]:
-    labels = list(labels)
-    size = len(labels)
-    return {label: 1.0 / size for label in labels}
+def _initialize_priors(num_labels: int) -> np.ndarray:
+    return np.full(num_labels, 1.0 / num_labels)
 
 
-def _initialize_confusion(reviewers: Iterable[ReviewerID], labels: Iterable[Label]) -> Dict[ReviewerID, Dict[Label, Dict[Label, float]]]:
-    labels = list(labels)
-    identity = {l: {obs: (1.0 if obs == l else SMOOTHING) for obs in labels} for l in labels}
-    for row in identity.values():
-        _normalize(row)
-    return {reviewer: {l: row.copy() for l, row in identity.items()} for reviewer in reviewers}
+def _initialize_confusion(num_reviewers: int, num_labels: int) -> np.ndarray:
+    identity = _normalize(np.eye(num_labels) * (1.0 - SMOOTHING) + SMOOTHING)
+    return np.tile(identity, (num_reviewers, 1, 1))
 
 
 def run_dawid_skene(reviews: Iterable[Review], labels: Iterable[Label] = DEFAULT_LABELS) -> Tuple[List[ConsensusResult], DawidSkeneModel]:
@@ -81,71 +77,78 @@ def run_dawid_skene(reviews: Iterable[Review], labels: Iterable[Label] = DEFAULT
         return [], DawidSkeneModel({}, {})
 
     labels = tuple(labels)
-    items = {review.item_id for review in reviews}
-    reviewers = {review.reviewer_id for review in reviews}
-
-    priors = _initialize_priors(labels)
-    confusion = _initialize_confusion(reviewers, labels)
+    label_index = {label: idx for idx, label in enumerate(labels)}
+    unknown = {review.label for review in reviews} - label_index.keys()
+    if unknown:
+        raise ValueError(f"reviews contain labels outside {labels}: {sorted(unknown)}")
+
+    # Dense integer ids so the E/M steps can run as array scatters.
+    items = list(dict.fromkeys(review.item_id for review in reviews))
+    reviewers = list(dict.fromkeys(review.reviewer_id for review in reviews))
+    item_index = {item: idx for idx, item in enumerate(items)}
+    reviewer_index = {reviewer: idx for idx, reviewer in enumerate(reviewers)}
+
+    count = len(reviews)
+    item_idx = np.fromiter((item_index[r.item_id] for r in reviews), dtype=np.intp, count=count)
+    reviewer_idx = np.fromiter((reviewer_index[r.reviewer_id] for r in reviews), dtype=np.intp, count=count)
+    obs_idx = np.fromiter((label_index[r.label] for r in reviews), dtype=np.intp, count=count)
+
+    num_items, num_labels = len(items), len(labels)
+    priors = _initialize_priors(num_labels)
+    # confusion[reviewer, true_label, observed_label]
+    confusion = _initialize_confusion(len(reviewers), num_labels)
 
     # Posterior per item for each iteration.
-    posteriors: Dict[ItemID, Dict[Label, float]] = {item: {label: 1.0 / len(labels) for label in labels} for item in items}
+    posteriors = np.full((num_items, num_labels), 1.0 / num_labels)
 
     for _ in range(MAX_ITERATIONS):
-        # E-step: compute posteriors for each item.
-        new_posteriors: Dict[ItemID, Dict[Label, float]] = {}
-        for item in items:
-            probs = {label: priors[label] for label in labels}
-            for review in filter(lambda r, item=item: r.item_id == item, reviews):
-                reviewer_matrix = confusion[review.reviewer_id]
-                for label in labels:
-                    probs[label] *= reviewer_matrix[label].get(review.label, SMOOTHING)
-            _normalize(probs)
-            new_posteriors[item] = probs
-
-        delta = max(
-            abs(new_posteriors[item][label] - posteriors[item][label])
-            for item in items
-            for label in labels
-        )
+        # E-step: accumulate log-likelihoods of every review onto its item.
+        with np.errstate(divide="ignore"):
+            log_probs = np.tile(np.log(priors), (num_items, 1))
+        np.add.at(log_probs, item_idx, np.log(confusion[reviewer_idx, :, obs_idx]))
+        log_probs -= log_probs.max(axis=1, keepdims=True)
+        new_posteriors = _normalize(np.exp(log_probs, out=log_probs))
+
+        delta = np.abs(new_posteriors - posteriors).max()
         posteriors = new_posteriors
 
         if delta < EPS:
             break
 
         # M-step: update priors and confusion matrices.
-        priors = {label: 0.0 for label in labels}
-        for probs in posteriors.values():
-            for label, prob in probs.items():
-                priors[label] += prob
-        _normalize(priors)
-
-        for reviewer in reviewers:
-            counts = {label: {obs: SMOOTHING for obs in labels} for label in labels}
-            for review in filter(lambda r, reviewer=reviewer: r.reviewer_id == reviewer, reviews):
-                probs = posteriors[review.item_id]
-                for label in labels:
-                    counts[label][review.label] += probs[label]
-            for label in labels:
-                _normalize(counts[label])
-            confusion[reviewer] = counts
+        priors = _normalize(posteriors.sum(axis=0))
+
+        counts = np.full_like(confusion, SMOOTHING)
+        np.add.at(counts, (reviewer_idx, slice(None), obs_idx), posteriors[item_idx])
+        confusion = _normalize(counts)
 
     results: List[ConsensusResult] = []
-    for item, probs in posteriors.items():
-        label = max(probs.items(), key=lambda kv: kv[1])[0]
-        confidence = probs[label]
+    best = posteriors.argmax(axis=1)
+    for item, row, best_idx in zip(items, posteriors.tolist(), best.tolist()):
+        label = labels[best_idx]
+        confidence = row[best_idx]
         threshold = ROUTING_THRESHOLDS.get(label, 1.0)
         needs_sme = confidence < threshold
         results.append(
             ConsensusResult(
                 item_id=item,
                 label=label,
-                posterior=dict(probs),
+                posterior=dict(zip(labels, row)),
                 confidence=confidence,
                 needs_sme=needs_sme,
             )
         )
 
-    model = DawidSkeneModel(priors=priors, confusion_matrices=confusion)
+    model = DawidSkeneModel(
+        priors=dict(zip(labels, priors.tolist())),
+        confusion_matrices={
+            reviewer: {
+                label: dict(zip(labels, matrix_row))
+                for label, matrix_row in zip(labels, matrix)
+            }
+            for reviewer, matrix in zip(reviewers, confusion.tolist())
+        },
+    )
     return results, model
 
 
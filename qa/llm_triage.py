@@ -9,7 +9,7 @@ priority flag (``HIGH``/``LOW``) plus a short reason string.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Set
 import re
 
 
@@ -19,49 +19,53 @@ class TriageResult:
     reason: str
 
 
-KEYWORD_RE = re.compile(r"[A-Za-z0-9%$,.]+")
+# Tokens may contain inner separators ("1,234.5") but never start or end with
+# sentence punctuation ("billion.", "revenue,"), so one findall pass yields
+# ready-to-compare terms.
+KEYWORD_RE = re.compile(r"[A-Za-z0-9%$](?:[A-Za-z0-9%$,.]*[A-Za-z0-9%$])?")
+_DIGIT_SEARCH = re.compile(r"\d").search
 PRIORITY_HIGH = "HIGH"
 PRIORITY_LOW = "LOW"
 
 
 def _extract_keywords(answer: str) -> List[str]:
-    tokens = KEYWORD_RE.findall(answer or "")
-    keywords: List[str] = []
-    for token in tokens:
+    """Return unique salient tokens from ``answer`` (lowercased, first-seen order)."""
+
+    keywords: Dict[str, None] = {}
+    for token in KEYWORD_RE.findall((answer or "").lower()):
         if token.isdigit() and len(token) == 1:
             continue
-        if len(token) <= 3 and not re.search(r"\d", token):
+        if len(token) <= 3 and not _DIGIT_SEARCH(token):
             continue
-        keywords.append(token.lower())
-    return keywords
+        keywords[token] = None
+    return list(keywords)
+
 
+def _quotes_from_citations(citations: Iterable[Dict]) -> Set[str]:
+    """Return the set of lowercased tokens appearing in any citation quote."""
 
-def _quotes_from_citations(citations: Iterable[Dict]) -> List[str]:
-    quotes: List[str] = []
+    quote_tokens: Set[str] = set()
     for citation in citations or []:
         quote = (citation or {}).get("quote")
         if quote:
-            quotes.append(str(quote).lower())
-    return quotes
-
-
-def triage_submission(submission: Dict) -> TriageResult:
-    """Assign a triage priority to a submission based on quote coverage."""
+            quote_tokens.update(KEYWORD_RE.findall(str(quote).lower()))
+    return quote_tokens
 
-    answer = submission.get("answer", "") or ""
-    citations = submission.get("citations", []) or []
-    keywords = _extract_keywords(answer)
-    quotes = _quotes_from_citations(citations)
 
+def _triage(answer: str, citations: Iterable[Dict], keyword_cache: Dict[str, List[str]]) -> TriageResult:
     if not answer.strip():
         return TriageResult(PRIORITY_HIGH, "blank answer")
-    if not quotes:
+    quote_tokens = _quotes_from_citations(citations)
+    if not quote_tokens:
         return TriageResult(PRIORITY_HIGH, "no supporting quotes provided")
 
+    keywords = keyword_cache.get(answer)
+    if keywords is None:
+        keywords = keyword_cache[answer] = _extract_keywords(answer)
+
     missing: List[str] = []
-    concatenated = " \n ".join(quotes)
     for keyword in keywords:
-        if keyword not in concatenated:
+        if keyword not in quote_tokens:
             missing.append(keyword)
         if len(missing) >= 3:
             break
@@ -73,4 +77,29 @@ def triage_submission(submission: Dict) -> TriageResult:
     return TriageResult(PRIORITY_LOW, "answer terms supported by quotes")
 
 
-__all__ = ["TriageResult", "triage_submission"]
+def triage_submissions(submissions: Iterable[Dict]) -> List[TriageResult]:
+    """Assign triage priorities to a batch of submissions.
+
+    Keyword extraction is shared across submissions with identical answers,
+    which is common when several reviewers' copies of one item are triaged
+    together.
+    """
+
+    keyword_cache: Dict[str, List[str]] = {}
+    return [
+        _triage(
+            submission.get("answer", "") or "",
+            submission.get("citations", []) or [],
+            keyword_cache,
+        )
+        for submission in submissions
+    ]
+
+
+def triage_submission(submission: Dict) -> TriageResult:
+    """Assign a triage priority to a submission based on quote coverage."""
+
+    return triage_submissions([submission])[0]
+
+
+__all__ = ["TriageResult", "triage_submission", "triage_submissions"]
@@ -8,8 +8,9 @@ non-EDGAR links) so review capacity is not wasted.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Iterable, List, Tuple
-from urllib.parse import urlparse
+from urllib.parse import urlsplit
 
 
 @dataclass
@@ -31,24 +32,38 @@ REQUIRED_TOP_LEVEL_FIELDS: Tuple[str, ...] = (
 )
 REQUIRED_METADATA_FIELDS: Tuple[str, ...] = ("category", "requires_calc")
 VALID_CATEGORIES = {"A", "B", "C", "C-Extended"}
+_SEC_URL_PREFIXES: Tuple[str, ...] = (
+    "https://www.sec.gov/",
+    "https://sec.gov/",
+    "http://www.sec.gov/",
+    "http://sec.gov/",
+)
 
 
 def _word_count(text: str) -> int:
     return len(text.split())
 
 
+@lru_cache(maxsize=8192)
 def _is_sec_domain(url: str) -> bool:
+    # Canonical EDGAR links need no parsing; submissions repeat them heavily.
+    if url.startswith(_SEC_URL_PREFIXES):
+        return True
     try:
-        hostname = urlparse(url).hostname or ""
+        hostname = urlsplit(url).hostname or ""
     except ValueError:
         return False
-    return hostname.endswith("sec.gov")
+    return hostname == "sec.gov" or hostname.endswith(".sec.gov")
 
 
 def _ensure_iterable(value) -> Iterable:
-    if isinstance(value, Iterable) and not isinstance(value, (str, bytes)):
-        return value
-    return ()
+    if value is None or isinstance(value, (str, bytes)):
+        return ()
+    try:
+        iter(value)
+    except TypeError:
+        return ()
+    return value
 
 
 def validate_submission(submission: Dict) -> Tuple[bool, List[ValidationIssue]]:
@@ -109,13 +124,15 @@ def validate_submission(submission: Dict) -> Tuple[bool, List[ValidationIssue]]:
         quote = citation.get("quote", "") or ""
         if not quote:
             issues.append(ValidationIssue(f"{prefix}.quote", "quote is required"))
-        elif _word_count(quote) > 30:
-            issues.append(
-                ValidationIssue(
-                    f"{prefix}.quote",
-                    f"quote has {_word_count(quote)} words (limit is 30)",
+        else:
+            word_count = _word_count(quote)
+            if word_count > 30:
+                issues.append(
+                    ValidationIssue(
+                        f"{prefix}.quote",
+                        f"quote has {word_count} words (limit is 30)",
+                    )
                 )
-            )
 
         page = citation.get("page")
         if page in (None, ""):
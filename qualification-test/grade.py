@@ -9,14 +9,38 @@ Grades the Advanced Test:
 Inputs:
   advanced_responses.csv  (see questions.md for schema)
 Outputs:
-  grading_report.json     (summary + per-worker/per-item results)
-  judge_payload.jsonl     (records for LLM triage on Q5/Q7/Q8)
+  grading_report.json       (summary + per-worker results)
+  grading_report_rows.jsonl (per-item results, one row per line)
+  judge_payload.jsonl       (records for LLM triage on Q5/Q7/Q8)
 """
 
-import csv, json, re, sys
+import csv, os, re, sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from operator import itemgetter
 from pathlib import Path
 from collections import defaultdict
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup; the grader runs on the stdlib alone.
+    import json
+    orjson = None
+
+if orjson is not None:
+    def dumps_line(obj):
+        return orjson.dumps(obj)
+
+    def dumps_report(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    def dumps_line(obj):
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def dumps_report(obj):
+        return json.dumps(obj, indent=2).encode("utf-8")
+
 ANSWER_KEY = {
     "q1": "A",
     "q2": "A",
@@ -25,28 +49,227 @@ ANSWER_KEY = {
     "q6": "B",
 }
 
+MC_QS = ("q1","q2","q3","q4","q6")
+SCORED_MC = frozenset(("q1","q2","q3","q4"))
+# (question, gold answer, counts toward the MC score) in report order.
+MC_ITEMS = tuple((q, ANSWER_KEY[q], q in SCORED_MC) for q in MC_QS)
+SCORED_MC_TOTAL = len(SCORED_MC)
+
+# Column names for each citation, in validate_citations tuple order.
+Q5_CITATION = ("q5_section", "q5_page", "q5_quote", "q5_url")
+Q7_CITATION = ("q7_section", "q7_page", "q7_quote", "q7_url")
+Q8_INTC_CITATION = ("q8_section_intc", "q8_page_intc", "q8_quote_intc", "q8_url_intc")
+Q8_QCOM_CITATION = ("q8_section_qcom", "q8_page_qcom", "q8_quote_qcom", "q8_url_qcom")
+
+# Every column the grader reads; see column_index.
+COLUMNS_USED = (
+    ("worker_id", "q5_answer", "q7_answer", "q8_answer", "notes")
+    + MC_QS + Q5_CITATION + Q7_CITATION + Q8_INTC_CITATION + Q8_QCOM_CITATION
+)
+
+CHUNK_ROWS = 1000
+# Chunks in flight per process; bounds how much of the CSV is held in memory.
+CHUNKS_PER_PROCESS = 2
+
 SEC_RE = re.compile(r"https?://[^ ]*sec\.gov[^ ]*", re.I)
+_SEC_SEARCH = SEC_RE.search
+_SEC_URL_PREFIXES = ("https://www.sec.gov/", "https://sec.gov/", "http://www.sec.gov/", "http://sec.gov/")
+_WORD_RE = re.compile(r"\b\w+\b")
+QUOTE_WORD_LIMIT = 30
+
+def exceeds_word_limit(text, limit=QUOTE_WORD_LIMIT):
+    # Skip the first `limit` words without materializing them; any further
+    # match means the text is too long.
+    return next(islice(_WORD_RE.finditer(text or ""), limit, None), None) is not None
 
-def word_count(text):
-    return len(re.findall(r"\b\w+\b", text or ""))
+def is_sec_url(url):
+    # Same acceptance as SEC_RE; the regex only runs for unusual spellings.
+    lowered = url.lower()
+    if lowered.startswith(_SEC_URL_PREFIXES):
+        return True
+    if "sec.gov" not in lowered:
+        return False
+    return _SEC_SEARCH(url) is not None
+
+def column_index(header):
+    """Map each name in COLUMNS_USED to its position in the CSV header.
+
+    Columns absent from the header map one past its end; _grade_chunk pads
+    short rows with None, matching what DictReader would have returned.
+    """
+    pos = {name: i for i, name in enumerate(header)}
+    missing = len(header)
+    return {name: pos.get(name, missing) for name in COLUMNS_USED}
+
+def columns_getter(columns, names):
+    return itemgetter(*(columns[n] for n in names))
 
 def is_numeric_page(val):
+    # Pages are 1-based; decimal strings (the common case) skip int()'s
+    # exception path, and obvious negatives are rejected without raising.
+    if val is None:
+        return False
+    s = str(val).strip()
+    if s.isdecimal():
+        return int(s) > 0
+    if s[:1] == "-" and s[1:].isdecimal():
+        return False
     try:
-        int(str(val).strip())
-        return True
-    except:
+        return int(s) > 0
+    except ValueError:
         return False
 
-def citation_ok(section, page, quote, url):
-    if not section or not str(section).strip():
-        return False, "missing_section"
-    if not is_numeric_page(page):
-        return False, "bad_page"
-    if not quote or word_count(quote) > 30:
-        return False, "quote_len"
-    if not url or not SEC_RE.search(url):
-        return False, "bad_url"
-    return True, None
+def grade_mc(answers):
+    """Return (per-question checks, scored MC answers correct) for one row.
+
+    `answers` holds the raw MC cells in MC_QS order.
+    """
+    checks = {}
+    correct_total = 0
+    for (q, gold, scored), pred in zip(MC_ITEMS, answers):
+        pred = (pred or "").strip().upper()
+        correct = (pred == gold)
+        checks[q] = {"pred": pred, "gold": gold, "correct": correct}
+        if scored and correct:
+            correct_total += 1
+    return checks, correct_total
+
+def validate_citations(cites, _page_ok=is_numeric_page, _too_long=exceeds_word_limit, _sec_ok=is_sec_url):
+    """Return an (ok, error tag) pair per (section, page, quote, url) tuple."""
+    # Checkers are bound as defaults so the loop uses fast local lookups.
+    out = []
+    append = out.append
+    for section, page, quote, url in cites:
+        if not section or not section.strip():
+            append((False, "missing_section"))
+        elif not _page_ok(page):
+            append((False, "bad_page"))
+        elif not quote or _too_long(quote):
+            append((False, "quote_len"))
+        elif not url or not _sec_ok(url):
+            append((False, "bad_url"))
+        else:
+            append((True, None))
+    return out
+
+def chunked(iterable, size=CHUNK_ROWS):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+def judge_record(item_id, answer, cites, calc=None):
+    """Serialize one LLM judge payload line (without the trailing newline)."""
+    payload = {
+        "item_id": item_id,
+        "answer": (answer or "").strip(),
+        "citations": [
+            {"section_or_note": s, "page": p, "quote": q, "edgar_url": u}
+            for (s,p,q,u) in cites if s or p or q or u
+        ]
+    }
+    if calc:
+        payload["calc"] = calc
+    return dumps_line(payload)
+
+def _grade_chunk(rows, columns):
+    """Grade a batch of csv.reader rows; `columns` comes from column_index.
+
+    Returns (report row JSONL bytes, judge JSONL bytes, per-worker stats) so
+    the parent process only concatenates output and sums counters.
+    """
+    row_lines = []
+    judge_lines = []
+    per_worker = defaultdict(lambda: {"mc_correct":0,"mc_total":0,"rows":0,"issues":defaultdict(int)})
+
+    i_worker = columns["worker_id"]
+    i_q5_answer = columns["q5_answer"]
+    i_q7_answer = columns["q7_answer"]
+    i_q8_answer = columns["q8_answer"]
+    i_notes = columns["notes"]
+    mc_answers = columns_getter(columns, MC_QS)
+    q5_fields = columns_getter(columns, Q5_CITATION)
+    q7_fields = columns_getter(columns, Q7_CITATION)
+    q8_intc_fields = columns_getter(columns, Q8_INTC_CITATION)
+    q8_qcom_fields = columns_getter(columns, Q8_QCOM_CITATION)
+    width = max(columns.values()) + 1
+
+    for row in rows:
+        if len(row) < width:
+            row += [None] * (width - len(row))
+        worker = (row[i_worker] or "unknown").strip() or "unknown"
+        stats = per_worker[worker]
+        stats["rows"] += 1
+
+        # --- Grade MC: Q1,Q2,Q3,Q4,Q6 ---
+        mc_checks, mc_correct = grade_mc(mc_answers(row))
+        stats["mc_total"] += SCORED_MC_TOTAL
+        stats["mc_correct"] += mc_correct
+
+        q5_cite = q5_fields(row)
+        q7_cite = q7_fields(row)
+        q8_intc_cite = q8_intc_fields(row)
+        q8_qcom_cite = q8_qcom_fields(row)
+
+        (ok5, err5), (ok7, err7), (ok_i, err_i), (ok_q, err_q) = validate_citations(
+            (q5_cite, q7_cite, q8_intc_cite, q8_qcom_cite)
+        )
+
+        # --- Validate Q5 citations (>=1) ---
+        q5_citations_ok = True
+        q5_issues = []
+        if not ok5:
+            q5_citations_ok = False
+            q5_issues.append(err5)
+
+        # --- Validate Q7 citations (>=1) ---
+        q7_citations_ok = True
+        q7_issues = []
+        if not ok7:
+            q7_citations_ok = False
+            q7_issues.append(err7)
+
+        # --- Validate Q8 citations (INTC + QCOM) ---
+        q8_citations_ok = True
+        q8_issues = []
+        if not ok_i:
+            q8_citations_ok = False
+            q8_issues.append(f"INTC:{err_i}")
+        if not ok_q:
+            q8_citations_ok = False
+            q8_issues.append(f"QCOM:{err_q}")
+
+        # --- Build judge payload for Q5/Q7/Q8 (triage aid only) ---
+        judge_lines += (
+            judge_record("Q5", row[i_q5_answer], (q5_cite,)),
+            judge_record("Q7", row[i_q7_answer], (q7_cite,)),
+            judge_record("Q8", row[i_q8_answer], (q8_intc_cite, q8_qcom_cite)),
+        )
+
+        # --- Aggregate issues for worker stats ---
+        for tag in q5_issues + q7_issues + q8_issues:
+            stats["issues"][tag] += 1
+
+        row_lines.append(dumps_line({
+            "worker_id": worker,
+            "mc": mc_checks,
+            "q5_citations_ok": q5_citations_ok,
+            "q5_issues": q5_issues,
+            "q7_citations_ok": q7_citations_ok,
+            "q7_issues": q7_issues,
+            "q8_citations_ok": q8_citations_ok,
+            "q8_issues": q8_issues,
+            "notes": (row[i_notes] or "").strip()
+        }))
+
+    # Plain dicts so the result pickles back to the parent process.
+    stats = {w: dict(d, issues=dict(d["issues"])) for w, d in per_worker.items()}
+    return _jsonl(row_lines), _jsonl(judge_lines), stats
+
+def _jsonl(lines):
+    return b"\n".join(lines) + b"\n" if lines else b""
 
 def main():
     in_csv = Path("advanced_responses.csv")
@@ -54,115 +277,70 @@ def main():
         print("ERROR: advanced_responses.csv not found", file=sys.stderr)
         sys.exit(1)
 
-    judge_out = Path("judge_payload.jsonl").open("w", encoding="utf-8")
+    judge_out = Path("judge_payload.jsonl").open("wb")
+    # Per-item rows are streamed to a sidecar JSONL so only the summary and
+    # per-worker aggregates stay in memory.
+    rows_out = Path("grading_report_rows.jsonl").open("wb")
     report = {
         "summary": {"workers": 0, "rows": 0, "mc_correct": 0, "mc_total": 0},
         "workers": {},
-        "rows": []
     }
 
-    per_worker = defaultdict(lambda: {"mc_correct":0,"mc_total":0,"rows":0,"issues":defaultdict(int)})
+    # Plain dicts throughout: a worker's first chunk stats are adopted as-is.
+    per_worker = {}
+
+    summary = report["summary"]
+
+    def merge(result):
+        row_bytes, judge_bytes, chunk_stats = result
+        rows_out.write(row_bytes)
+        judge_out.write(judge_bytes)
+        for worker, d in chunk_stats.items():
+            summary["rows"] += d["rows"]
+            summary["mc_correct"] += d["mc_correct"]
+            summary["mc_total"] += d["mc_total"]
+            stats = per_worker.get(worker)
+            if stats is None:
+                per_worker[worker] = d
+                continue
+            stats["rows"] += d["rows"]
+            stats["mc_correct"] += d["mc_correct"]
+            stats["mc_total"] += d["mc_total"]
+            issues = stats["issues"]
+            for tag, n in d["issues"].items():
+                issues[tag] = issues.get(tag, 0) + n
 
     with in_csv.open(newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        report["summary"]["workers"] = len(set())
-        for row in reader:
-            report["summary"]["rows"] += 1
-            worker = row.get("worker_id","unknown").strip() or "unknown"
-            per_worker[worker]["rows"] += 1
-
-            # --- Grade MC: Q1,Q2,Q3,Q4,Q6 ---
-            mc_checks = {}
-            for q in ["q1","q2","q3","q4","q6"]:
-                pred = (row.get(q,"") or "").strip().upper()
-                gold = ANSWER_KEY.get(q)
-                correct = (pred == gold)
-                mc_checks[q] = {"pred": pred, "gold": gold, "correct": correct}
-                if q in ["q1","q2","q3","q4"]:
-                    per_worker[worker]["mc_total"] += 1
-                    report["summary"]["mc_total"] += 1
-                    if correct:
-                        per_worker[worker]["mc_correct"] += 1
-                        report["summary"]["mc_correct"] += 1
-
-            # --- Validate Q5 citations (>=1) ---
-            q5_citations_ok = True
-            q5_issues = []
-            ok, err = citation_ok(row.get("q5_section"), row.get("q5_page"), row.get("q5_quote"), row.get("q5_url"))
-            if not ok:
-                q5_citations_ok = False
-                q5_issues.append(err)
-
-            # --- Validate Q7 citations (>=1) ---
-            q7_citations_ok = True
-            q7_issues = []
-            ok, err = citation_ok(row.get("q7_section"), row.get("q7_page"), row.get("q7_quote"), row.get("q7_url"))
-            if not ok:
-                q7_citations_ok = False
-                q7_issues.append(err)
-
-            # --- Validate Q8 citations (INTC + QCOM) ---
-            q8_citations_ok = True
-            q8_issues = []
-            ok_i, err_i = citation_ok(row.get("q8_section_intc"), row.get("q8_page_intc"), row.get("q8_quote_intc"), row.get("q8_url_intc"))
-            ok_q, err_q = citation_ok(row.get("q8_section_qcom"), row.get("q8_page_qcom"), row.get("q8_quote_qcom"), row.get("q8_url_qcom"))
-            if not ok_i:
-                q8_citations_ok = False
-                q8_issues.append(f"INTC:{err_i}")
-            if not ok_q:
-                q8_citations_ok = False
-                q8_issues.append(f"QCOM:{err_q}")
-
-            # --- Build judge payload for Q5/Q7/Q8 (triage aid only) ---
-            def add_judge(item_id, answer, cites, calc=None):
-                payload = {
-                    "item_id": item_id,
-                    "answer": (answer or "").strip(),
-                    "citations": [
-                        {"section_or_note": s, "page": p, "quote": q, "edgar_url": u}
-                        for (s,p,q,u) in cites if s or p or q or u
-                    ]
-                }
-                if calc:
-                    payload["calc"] = calc
-                judge_out.write(json.dumps(payload, ensure_ascii=False) + "\n")
-
-            add_judge(
-                "Q5",
-                row.get("q5_answer"),
-                [(row.get("q5_section"), row.get("q5_page"), row.get("q5_quote"), row.get("q5_url"))]
-            )
-            add_judge(
-                "Q7",
-                row.get("q7_answer"),
-                [(row.get("q7_section"), row.get("q7_page"), row.get("q7_quote"), row.get("q7_url"))]
-            )
-            add_judge(
-                "Q8",
-                row.get("q8_answer"),
-                [
-                    (row.get("q8_section_intc"), row.get("q8_page_intc"), row.get("q8_quote_intc"), row.get("q8_url_intc")),
-                    (row.get("q8_section_qcom"), row.get("q8_page_qcom"), row.get("q8_quote_qcom"), row.get("q8_url_qcom")),
-                ]
-            )
-
-            # --- Aggregate issues for worker stats ---
-            for tag in q5_issues + q7_issues + q8_issues:
-                per_worker[worker]["issues"][tag] += 1
-
-            report["rows"].append({
-                "worker_id": worker,
-                "mc": mc_checks,
-                "q5_citations_ok": q5_citations_ok,
-                "q5_issues": q5_issues,
-                "q7_citations_ok": q7_citations_ok,
-                "q7_issues": q7_issues,
-                "q8_citations_ok": q8_citations_ok,
-                "q8_issues": q8_issues,
-                "notes": row.get("notes","").strip()
-            })
+        # csv.reader yields plain lists, which are cheaper to build and to
+        # pickle to the pool than DictReader's per-row dicts.
+        reader = csv.reader(f)
+        columns = column_index(next(reader, []))
+        # DictReader skipped blank lines; keep doing so.
+        rows = (row for row in reader if row)
+        chunks = chunked(rows)
+        first = next(chunks, None)
+        if first is not None and len(first) < CHUNK_ROWS:
+            # The whole CSV fits in one chunk (the usual one-row-per-candidate
+            # case); grading inline skips process pool startup.
+            merge(_grade_chunk(first, columns))
+        elif first is not None:
+            processes = os.cpu_count() or 1
+            with ProcessPoolExecutor(processes) as pool:
+                # Results are merged in submission order, so output files and
+                # worker/issue ordering match a sequential pass. Executor.map
+                # would submit every chunk up front, hence the bounded window.
+                max_pending = processes * CHUNKS_PER_PROCESS
+                pending = deque()
+                for chunk in chain((first,), chunks):
+                    pending.append(pool.submit(_grade_chunk, chunk, columns))
+                    if len(pending) >= max_pending:
+                        merge(pending.popleft().result())
+                while pending:
+                    merge(pending.popleft().result())
 
     judge_out.close()
+    rows_out.close()
+    summary["workers"] = len(per_worker)
 
     # Per-worker summary
     report["workers"] = {
@@ -176,8 +354,8 @@ def main():
         for w,d in per_worker.items()
     }
 
-    Path("grading_report.json").write_text(json.dumps(report, indent=2), encoding="utf-8")
-    print("Wrote grading_report.json and judge_payload.jsonl")
+    Path("grading_report.json").write_bytes(dumps_report(report))
+    print("Wrote grading_report.json, grading_report_rows.jsonl and judge_payload.jsonl")
 
 if __name__ == "__main__":
     main()
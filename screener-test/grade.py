@@ -1,29 +1,49 @@
 
-import json, re, sys
+import re, sys
+from itertools import islice
+
+try:
+    import orjson
+    loads, dumps = orjson.loads, orjson.dumps
+except ImportError:  # optional speedup; fall back to the stdlib
+    import json
+    loads = json.loads
+    def dumps(obj): return json.dumps(obj).encode("utf-8")
 
 MCQ_KEY = {"q1": "B", "q2": "B", "q3": "C", "q4": "C"}
+MCQ_KEY_ITEMS = tuple(MCQ_KEY.items())
 PASS_TOTAL = 5
 PERCENT_RE = re.compile(r"^\s*\d{1,3}(?:\.\d+)?\s*%?\s*$")
-SEC_DOMAIN_RE = re.compile(r"^https://(www\.)?sec\.gov/", re.I)
+_SEC_PREFIXES = ("https://sec.gov/", "https://www.sec.gov/")
+WORD_RE = re.compile(r"\b\w+\b")
+QUOTE_WORD_LIMIT = 30
+
+def exceeds_word_limit(s, limit=QUOTE_WORD_LIMIT):
+    # Stops scanning at word limit+1 instead of tokenizing the whole quote.
+    return next(islice(WORD_RE.finditer(s or ""), limit, None), None) is not None
 
-def words(s): return len(re.findall(r"\b\w+\b", s or ""))
+def _is_sec(url):
+    # Case-insensitive fixed-prefix match; no need for the regex engine.
+    return url.lower().startswith(_SEC_PREFIXES) if url else False
 
 def normalize_percent(s):
     s = (s or "").strip()
     return s if s.endswith("%") else (s + "%" if s else s)
 
-def validate_q5_fields(q5):
-    notes, ok = [], True
+def validate_q5_fields(q5, ans):
+    # ans is the already-normalized answer (see normalize_percent).
     if not q5: return False, ["missing q5 block"]
-    ans = normalize_percent(q5.get("answer",""))
-    if not PERCENT_RE.match(ans): ok, notes = False, notes + ["answer not a percent"]
-    if words(q5.get("quote","")) > 30: ok, notes = False, notes + ["quote > 30 words"]
-    if not isinstance(q5.get("page",None), int) or q5["page"] <= 0: ok, notes = False, notes + ["invalid page"]
-    if not SEC_DOMAIN_RE.match(q5.get("url","")): ok, notes = False, notes + ["non-SEC URL"]
-    if not q5.get("section"): ok, notes = False, notes + ["missing section"]
-    return ok, notes
-
-def build_judge_prompt(q5):
+    notes = []
+    get = q5.get
+    if not PERCENT_RE.match(ans): notes.append("answer not a percent")
+    if exceeds_word_limit(get("quote","")): notes.append("quote > 30 words")
+    page = get("page")
+    if not isinstance(page, int) or page <= 0: notes.append("invalid page")
+    if not _is_sec(get("url","")): notes.append("non-SEC URL")
+    if not get("section"): notes.append("missing section")
+    return not notes, notes
+
+def build_judge_prompt(q5, ans):
     return f"""
 You are grading a candidate’s answer using ONLY the provided evidence from an SEC filing.
 
@@ -31,7 +51,7 @@ You are grading a candidate’s answer using ONLY the provided evidence from an
 What percentage of revenue came from customers outside the United States in the second quarter of fiscal year 2026?
 
 [ANSWER]
-{normalize_percent(q5.get('answer',''))}
+{ans}
 
 [EVIDENCE]
 Section/Note: {q5.get('section','')}
@@ -49,29 +69,28 @@ Return JSON ONLY with integer scores 1–5 and a short reason:
 }}
 """.strip()
 
-def call_llm_judge(prompt):
-    # TODO: replace with your LLM API call.
+def call_llm_judge(ans, quote):
+    # TODO: replace with your LLM API call, sending build_judge_prompt(q5, ans);
+    # the prompt is only worth assembling once a real backend is wired in.
     # Demo heuristic: pass only if '50%' appears in both answer and quote.
-    has_50_answer = "50%" in prompt.split("[ANSWER]")[1]
-    has_50_quote = "50%" in prompt.split('Quote (≤30 words): "')[1]
-    if has_50_answer and has_50_quote:
+    if "50%" in ans and "50%" in quote:
         return {"factuality":5,"citation":5,"clarity":5,"safety":5,"reason":"answer matches quote"}
     return {"factuality":2,"citation":3,"clarity":3,"safety":5,"reason":"mismatch or weak citation"}
 
 def main(in_path, out_path):
-    with open(in_path, "r", encoding="utf-8") as f_in, open(out_path, "w", encoding="utf-8") as f_out:
+    with open(in_path, "rb") as f_in, open(out_path, "wb") as f_out:
         for line in f_in:
-            sub = json.loads(line)
+            sub = loads(line)
             notes = []
-            mcq_correct = sum(1 for k,v in MCQ_KEY.items() if sub.get(k,"").strip().upper() == v)
+            mcq_correct = sum([sub.get(k,"").strip().upper() == v for k,v in MCQ_KEY_ITEMS])
             total_points = mcq_correct
             q5 = sub.get("q5")
-            valid, vnotes = validate_q5_fields(q5)
+            ans = normalize_percent(q5.get("answer","")) if q5 else ""
+            valid, vnotes = validate_q5_fields(q5, ans)
             notes += vnotes
             q5_scores = None
             if valid:
-                prompt = build_judge_prompt(q5)
-                q5_scores = call_llm_judge(prompt)
+                q5_scores = call_llm_judge(ans, q5.get("quote",""))
                 q5_pass = (
                     q5_scores.get("factuality",0) >= 5 and
                     q5_scores.get("citation",0)   >= 4 and
@@ -90,7 +109,7 @@ def main(in_path, out_path):
                 "passed": passed,
                 "notes": notes
             }
-            f_out.write(json.dumps(out) + "\n")
+            f_out.write(dumps(out) + b"\n")
 
 if __name__ == "__main__":
     in_path = sys.argv[1] if len(sys.argv) > 1 else "grader/schema_examples/submissions.jsonl"